@@ -3,11 +3,19 @@ Chart Builder Tool
 Automatically creates visualizations from pandas DataFrames with intelligent chart selection
 """
 
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive backend, charts are only saved to disk
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba
+from matplotlib.lines import Line2D
 import seaborn as sns
 import pandas as pd
-from typing import Optional, List, Tuple
+import numpy as np
+from typing import Any, Dict, Optional, List, Tuple
+import functools
 import os
+import re
 from datetime import datetime
 
 # Set style for professional-looking charts
@@ -15,6 +23,66 @@ sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (10, 6)
 plt.rcParams['font.size'] = 10
 
+# Column name patterns for large currency metrics vs. count metrics
+_MONEY_RE = re.compile(r'revenue|sales|income|profit|amount', re.I)
+_COUNT_RE = re.compile(r'customer|user|count|total|number', re.I)
+
+# Per-point value labels are skipped above this many rows to keep charts legible
+MAX_POINT_LABELS = 30
+
+# Line chart markers are skipped above this many rows
+MAX_MARKER_POINTS = 100
+
+# Saved charts are capped at this width in pixels, and large datasets are
+# saved at a lower dpi since their detail doesn't survive downscaling anyway
+MAX_CHART_WIDTH_PX = 1800
+LARGE_DATASET_ROWS = 1000
+
+
+@functools.lru_cache(maxsize=64)
+def _classify_schema(
+    columns: Tuple[str, ...],
+    numeric_cols: Tuple[str, ...]
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Pick a chart type from the column layout alone
+    
+    Covers the keyword and column-count rules of ChartBuilder.detect_chart_type;
+    the value-based scale check is done by the caller before this.
+    
+    Args:
+        columns: All DataFrame columns
+        numeric_cols: Numeric DataFrame columns
+        
+    Returns:
+        Tuple of (chart_type, chart_config); callers must copy the config dict
+    """
+    # If columns have similar keywords (revenue/sales vs customers/users), use dual axis
+    large_cols = [col for col in numeric_cols if _MONEY_RE.search(col)]
+    count_cols = [col for col in numeric_cols if _COUNT_RE.search(col)]
+    
+    if large_cols and count_cols and len(numeric_cols) >= 2:
+        return "dual_axis", {
+            "x_column": columns[0],
+            "y1_column": large_cols[0],
+            "y2_column": count_cols[0],
+            "y1_label": large_cols[0],
+            "y2_label": count_cols[0]
+        }
+    
+    # Single numeric column - use bar chart
+    if len(numeric_cols) == 1:
+        return "bar", {
+            "x_column": columns[0],
+            "y_column": numeric_cols[0]
+        }
+    
+    # Multiple numeric columns with similar scales - use line chart
+    return "line", {
+        "x_column": columns[0],
+        "y_columns": numeric_cols
+    }
+
 
 class ChartBuilder:
     """
@@ -31,6 +99,10 @@ class ChartBuilder:
         """
         self.output_dir = output_dir
         self._ensure_output_dir()
+        
+        # One figure is reused for every chart instead of rebuilding it each time
+        self._fig, self._ax = plt.subplots(figsize=(12, 6))
+        self._fig.set_layout_engine('tight')
     
     def _ensure_output_dir(self) -> None:
         """Create output directory if it doesn't exist"""
@@ -38,29 +110,73 @@ class ChartBuilder:
             os.makedirs(self.output_dir)
             print(f"✓ Created charts directory: {self.output_dir}")
     
-    def _save_chart(self, filename: str) -> str:
+    def _reset_figure(self, figsize: Tuple[int, int]) -> plt.Axes:
+        """
+        Clear the shared figure and return a fresh axes to draw on
+        
+        Args:
+            figsize: Figure size in inches
+            
+        Returns:
+            Empty axes on the shared figure
+        """
+        self._fig.clear()
+        self._fig.set_size_inches(*figsize)
+        self._ax = self._fig.add_subplot()
+        return self._ax
+    
+    def _adaptive_dpi(self, n_rows: int) -> int:
+        """
+        Pick an output dpi from the figure width and the number of rows plotted
+        
+        Args:
+            n_rows: Number of data rows in the chart
+            
+        Returns:
+            Dots per inch for savefig
+        """
+        dpi = min(150, int(MAX_CHART_WIDTH_PX / self._fig.get_figwidth()))
+        if n_rows > LARGE_DATASET_ROWS:
+            dpi = min(dpi, 100)
+        return dpi
+    
+    def _save_chart(
+        self,
+        filename: str,
+        dpi: Optional[int] = None,
+        verbose: bool = True,
+        n_rows: int = 0
+    ) -> str:
         """
         Save chart and return filepath
         
         Args:
             filename: Name for the chart file
+            dpi: Output resolution (picked from figure size and n_rows if not provided)
+            verbose: Print where the chart was saved
+            n_rows: Number of data rows in the chart
             
         Returns:
             Full path to saved chart
         """
         filepath = os.path.join(self.output_dir, filename)
-        plt.tight_layout()
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
-        print(f"✓ Chart saved: {filepath}")
+        dpi = dpi or self._adaptive_dpi(n_rows)
+        self._fig.savefig(
+            filepath,
+            dpi=dpi,
+            pil_kwargs={'optimize': False, 'compress_level': 1}
+        )
+        if verbose:
+            print(f"✓ Chart saved: {filepath}")
         return filepath
     
-    def _detect_chart_type(self, df: pd.DataFrame) -> Tuple[str, dict]:
+    def detect_chart_type(self, df: pd.DataFrame, verbose: bool = True) -> Tuple[str, dict]:
         """
         Intelligently detect the best chart type based on data characteristics
         
         Args:
             df: Input DataFrame
+            verbose: Print which rule picked the chart type
             
         Returns:
             Tuple of (chart_type, chart_config)
@@ -74,15 +190,16 @@ class ChartBuilder:
         # 1. Do we have 2+ numeric columns?
         # 2. Are their scales very different? (order of magnitude)
         if len(numeric_cols) >= 2:
-            col1_mean = df[numeric_cols[0]].mean()
-            col2_mean = df[numeric_cols[1]].mean()
+            col1_mean, col2_mean = np.nanmean(df[numeric_cols[:2]].to_numpy(dtype=float), axis=0)
+            smaller = min(col1_mean, col2_mean)
             
             # If one column is 10x+ larger than the other, use dual axis
-            ratio = max(col1_mean, col2_mean) / min(col1_mean, col2_mean)
+            ratio = max(col1_mean, col2_mean) / smaller if smaller > 0 else 0
             
             if ratio >= 10:
-                print(f"🧠 Detected large scale difference (ratio: {ratio:.1f}x)")
-                print(f"   → Using dual-axis chart for better visualization")
+                if verbose:
+                    print(f"🧠 Detected large scale difference (ratio: {ratio:.1f}x)")
+                    print(f"   → Using dual-axis chart for better visualization")
                 
                 return "dual_axis", {
                     "x_column": df.columns[0],
@@ -92,47 +209,24 @@ class ChartBuilder:
                     "y2_label": numeric_cols[1]
                 }
         
-        # If columns have similar keywords (revenue/sales vs customers/users), use dual axis
-        keywords_large = ['revenue', 'sales', 'income', 'profit', 'amount']
-        keywords_count = ['customer', 'user', 'count', 'total', 'number']
+        # Everything below depends only on column names, so it is cached
+        chart_type, config = _classify_schema(tuple(df.columns), tuple(numeric_cols))
         
-        col_names_lower = [col.lower() for col in numeric_cols]
-        has_large = any(kw in col for col in col_names_lower for kw in keywords_large)
-        has_count = any(kw in col for col in col_names_lower for kw in keywords_count)
-        
-        if has_large and has_count and len(numeric_cols) >= 2:
+        if verbose and chart_type == "dual_axis":
             print("🧠 Detected revenue/customer pattern")
             print("   → Using dual-axis chart to show both metrics clearly")
-            
-            large_col = [col for col in numeric_cols if any(kw in col.lower() for kw in keywords_large)][0]
-            count_col = [col for col in numeric_cols if any(kw in col.lower() for kw in keywords_count)][0]
-            
-            return "dual_axis", {
-                "x_column": df.columns[0],
-                "y1_column": large_col,
-                "y2_column": count_col,
-                "y1_label": large_col,
-                "y2_label": count_col
-            }
-        
-        # Single numeric column - use bar chart
-        if len(numeric_cols) == 1:
+        elif verbose and chart_type == "bar":
             print("🧠 Single metric detected")
             print("   → Using bar chart")
-            
-            return "bar", {
-                "x_column": df.columns[0],
-                "y_column": numeric_cols[0]
-            }
+        elif verbose:
+            print("🧠 Multiple metrics with similar scales")
+            print("   → Using line chart for trend comparison")
         
-        # Multiple numeric columns with similar scales - use line chart
-        print("🧠 Multiple metrics with similar scales")
-        print("   → Using line chart for trend comparison")
-        
-        return "line", {
-            "x_column": df.columns[0],
-            "y_columns": numeric_cols
-        }
+        # Copy so callers can't mutate the cached config
+        config = dict(config)
+        if "y_columns" in config:
+            config["y_columns"] = list(config["y_columns"])
+        return chart_type, config
     
     def create_bar_chart(
         self,
@@ -140,7 +234,8 @@ class ChartBuilder:
         x_column: str,
         y_column: str,
         title: Optional[str] = None,
-        filename: Optional[str] = None
+        filename: Optional[str] = None,
+        verbose: bool = True
     ) -> str:
         """
         Create a bar chart from DataFrame
@@ -151,21 +246,22 @@ class ChartBuilder:
             y_column: Column for y-axis
             title: Chart title
             filename: Output filename
+            verbose: Print where the chart was saved
             
         Returns:
             Path to saved chart
         """
         try:
-            plt.figure(figsize=(10, 6))
+            ax = self._reset_figure((10, 6))
             
             # Create bar chart
-            ax = sns.barplot(data=df, x=x_column, y=y_column, palette="viridis")
+            sns.barplot(data=df, x=x_column, y=y_column, palette="viridis", ax=ax)
             
             # Customize
-            plt.title(title or f"{y_column} by {x_column}", fontsize=14, fontweight='bold')
-            plt.xlabel(x_column, fontsize=12)
-            plt.ylabel(y_column, fontsize=12)
-            plt.xticks(rotation=45, ha='right')
+            ax.set_title(title or f"{y_column} by {x_column}", fontsize=14, fontweight='bold')
+            ax.set_xlabel(x_column, fontsize=12)
+            ax.set_ylabel(y_column, fontsize=12)
+            plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
             
             # Add value labels on bars
             for container in ax.containers:
@@ -173,7 +269,7 @@ class ChartBuilder:
             
             # Save
             filename = filename or f"bar_chart_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            return self._save_chart(filename)
+            return self._save_chart(filename, verbose=verbose, n_rows=len(df))
             
         except Exception as e:
             raise Exception(f"Error creating bar chart: {str(e)}")
@@ -184,7 +280,8 @@ class ChartBuilder:
         x_column: str,
         y_columns: List[str],
         title: Optional[str] = None,
-        filename: Optional[str] = None
+        filename: Optional[str] = None,
+        verbose: bool = True
     ) -> str:
         """
         Create a line chart from DataFrame
@@ -195,28 +292,60 @@ class ChartBuilder:
             y_columns: List of columns for y-axis (can plot multiple lines)
             title: Chart title
             filename: Output filename
+            verbose: Print where the chart was saved
             
         Returns:
             Path to saved chart
         """
         try:
-            plt.figure(figsize=(12, 6))
+            ax = self._reset_figure((12, 6))
+            
+            # Non-numeric x values (e.g. month names) are plotted at evenly spaced positions
+            if pd.api.types.is_numeric_dtype(df[x_column]):
+                x_vals = df[x_column].to_numpy(dtype=float)
+            else:
+                x_vals = np.arange(len(df), dtype=float)
+                ax.set_xticks(x_vals)
+                ax.set_xticklabels(df[x_column].astype(str))
+            
+            # Only numeric columns can be drawn as lines
+            y_columns = [col for col in y_columns if pd.api.types.is_numeric_dtype(df[col])]
+            if not y_columns:
+                raise ValueError("No numeric columns found for visualization")
+            
+            # Draw all series as one LineCollection instead of a Line2D per column
+            y_vals = df[y_columns].to_numpy(dtype=float).T
+            segments = np.stack([np.broadcast_to(x_vals, y_vals.shape), y_vals], axis=-1)
+            cycle = plt.rcParams['axes.prop_cycle'].by_key()['color']
+            colors = [to_rgba(cycle[i % len(cycle)]) for i in range(len(y_columns))]
+            ax.add_collection(LineCollection(segments, colors=colors, linewidths=2))
             
-            # Plot each y column
-            for col in y_columns:
-                plt.plot(df[x_column], df[col], marker='o', label=col, linewidth=2)
+            # Markers for every point in a single scatter, skipped on long series
+            show_markers = len(df) <= MAX_MARKER_POINTS
+            if show_markers:
+                ax.scatter(
+                    np.tile(x_vals, len(y_columns)),
+                    y_vals.ravel(),
+                    c=np.repeat(colors, len(x_vals), axis=0),
+                    s=36,
+                    zorder=3
+                )
+            ax.autoscale_view()
             
             # Customize
-            plt.title(title or f"Trend Analysis", fontsize=14, fontweight='bold')
-            plt.xlabel(x_column, fontsize=12)
-            plt.ylabel("Value", fontsize=12)
-            plt.legend()
-            plt.grid(True, alpha=0.3)
-            plt.xticks(rotation=45, ha='right')
+            ax.set_title(title or f"Trend Analysis", fontsize=14, fontweight='bold')
+            ax.set_xlabel(x_column, fontsize=12)
+            ax.set_ylabel("Value", fontsize=12)
+            ax.legend(handles=[
+                Line2D([], [], color=color, linewidth=2, marker='o' if show_markers else None, label=col)
+                for col, color in zip(y_columns, colors)
+            ])
+            ax.grid(True, alpha=0.3)
+            plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
             
             # Save
             filename = filename or f"line_chart_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            return self._save_chart(filename)
+            return self._save_chart(filename, verbose=verbose, n_rows=len(df))
             
         except Exception as e:
             raise Exception(f"Error creating line chart: {str(e)}")
@@ -230,7 +359,8 @@ class ChartBuilder:
         y1_label: Optional[str] = None,
         y2_label: Optional[str] = None,
         title: Optional[str] = None,
-        filename: Optional[str] = None
+        filename: Optional[str] = None,
+        verbose: bool = True
     ) -> str:
         """
         Create a chart with two y-axes for metrics with different scales
@@ -244,53 +374,54 @@ class ChartBuilder:
             y2_label: Label for right y-axis
             title: Chart title
             filename: Output filename
+            verbose: Print where the chart was saved
             
         Returns:
             Path to saved chart
         """
         try:
-            fig, ax1 = plt.subplots(figsize=(12, 6))
+            ax1 = self._reset_figure((12, 6))
             
             y1_label = y1_label or y1_column
             y2_label = y2_label or y2_column
             
             # Plot first y-axis (typically larger values like Revenue) - Bar chart
             color1 = '#2E86AB'
-            ax1.bar(df[x_column], df[y1_column], color=color1, alpha=0.7, label=y1_label)
+            is_money = bool(_MONEY_RE.search(y1_column))
+            bars = ax1.bar(df[x_column], df[y1_column], color=color1, alpha=0.7, label=y1_label)
             ax1.set_xlabel(x_column, fontsize=12, fontweight='bold')
             ax1.set_ylabel(y1_label, color=color1, fontsize=12, fontweight='bold')
             ax1.tick_params(axis='y', labelcolor=color1)
             
             # Format y1 axis labels (add $ if it's revenue/sales)
-            if any(kw in y1_column.lower() for kw in ['revenue', 'sales', 'income', 'profit']):
+            if is_money:
                 ax1.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
             
             # Add value labels on bars
-            for i, v in enumerate(df[y1_column]):
-                if any(kw in y1_column.lower() for kw in ['revenue', 'sales', 'income', 'profit']):
-                    label = f'${v:,.0f}'
-                else:
-                    label = f'{v:,.0f}'
-                ax1.text(i, v, label, ha='center', va='bottom', fontweight='bold', fontsize=9)
+            show_labels = len(df) <= MAX_POINT_LABELS
+            if show_labels:
+                labels = [f'${v:,.0f}' if is_money else f'{v:,.0f}' for v in df[y1_column]]
+                ax1.bar_label(bars, labels=labels, fontweight='bold', fontsize=9)
             
             # Create second y-axis (typically counts like Customers) - Line chart
             ax2 = ax1.twinx()
             color2 = '#A23B72'
-            ax2.plot(df[x_column], df[y2_column], color=color2, marker='o', 
-                    linewidth=3, markersize=8, label=y2_label)
+            line, = ax2.plot(df[x_column], df[y2_column], color=color2, marker='o', 
+                             linewidth=3, markersize=8, label=y2_label)
             ax2.set_ylabel(y2_label, color=color2, fontsize=12, fontweight='bold')
             ax2.tick_params(axis='y', labelcolor=color2)
             
             # Add value labels on line
-            for i, v in enumerate(df[y2_column]):
-                ax2.text(i, v, f'{v:,.0f}', ha='center', va='bottom', 
-                        color=color2, fontweight='bold', fontsize=9)
+            if show_labels:
+                for xy, v in zip(line.get_xydata(), df[y2_column]):
+                    ax2.annotate(f'{v:,.0f}', xy, ha='center', va='bottom', 
+                                 color=color2, fontweight='bold', fontsize=9)
             
             # Title and grid
-            plt.title(title or f"{y1_label} and {y2_label} Analysis", 
-                     fontsize=14, fontweight='bold', pad=20)
+            ax1.set_title(title or f"{y1_label} and {y2_label} Analysis", 
+                          fontsize=14, fontweight='bold', pad=20)
             ax1.grid(True, alpha=0.3, linestyle='--')
-            plt.xticks(rotation=45, ha='right')
+            plt.setp(ax1.get_xticklabels(), rotation=45, ha='right')
             
             # Add legends
             lines1, labels1 = ax1.get_legend_handles_labels()
@@ -299,7 +430,7 @@ class ChartBuilder:
             
             # Save
             filename = filename or f"dual_axis_chart_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            return self._save_chart(filename)
+            return self._save_chart(filename, verbose=verbose, n_rows=len(df))
             
         except Exception as e:
             raise Exception(f"Error creating dual axis chart: {str(e)}")
@@ -328,7 +459,7 @@ class ChartBuilder:
         print(f"   Rows: {len(df)}")
         
         # Detect best chart type
-        chart_type, config = self._detect_chart_type(df)
+        chart_type, config = self.detect_chart_type(df)
         
         # Create the appropriate chart
         if chart_type == "dual_axis":
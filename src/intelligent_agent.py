@@ -7,6 +7,12 @@ from sheets_connector import SheetsConnector
 from Chart_builder import ChartBuilder
 from openai_connector import OpenAIConnector
 import pandas as pd
+import json
+import os
+import tempfile
+from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
 
 class IntelligentAgent:
@@ -14,14 +20,172 @@ class IntelligentAgent:
     Agentic workflow that uses OpenAI to make intelligent decisions
     """
     
-    def __init__(self):
-        """Initialize all tools"""
+    def __init__(self, debug: bool = False):
+        """
+        Initialize all tools
+        
+        Args:
+            debug: Print column and data previews while running
+        """
+        self.debug = debug
         print("🤖 Initializing Intelligent Agent...")
         self.sheets = SheetsConnector()
         self.charts = ChartBuilder()
         self.ai = OpenAIConnector()
         print("✓ All systems ready!\n")
     
+    @staticmethod
+    def _summarize(df: pd.DataFrame, max_stat_columns: int = 10) -> str:
+        """
+        Build a compact JSON summary of the data for the AI prompt
+        
+        Only mean/min/max are sent, for the highest-variance numeric columns,
+        to keep the prompt small on wide sheets.
+        
+        Args:
+            df: Input DataFrame
+            max_stat_columns: Maximum number of numeric columns to describe
+            
+        Returns:
+            JSON string with dtypes, a 3-row preview and key statistics
+        """
+        numeric = df.select_dtypes(include=['number'])
+        stats = {}
+        if not numeric.empty:
+            top_cols = numeric.var().nlargest(max_stat_columns).index
+            stats = numeric[top_cols].describe().loc[['mean', 'min', 'max']].to_dict()
+        
+        summary = {
+            'dtypes': df.dtypes.astype(str).to_dict(),
+            'head': df.head(3).to_dict('list'),
+            'stats': stats
+        }
+        return json.dumps(summary, default=str)
+    
+    @staticmethod
+    def _plan_from_recommendation(
+        recommendation: Dict[str, Any],
+        numeric_columns: List[str]
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Turn an AI recommendation into a chart type and its column arguments
+        
+        Args:
+            recommendation: Recommendation returned by OpenAI
+            numeric_columns: Numeric DataFrame columns
+            
+        Returns:
+            Tuple of (chart_type, column keyword arguments)
+        """
+        x_column = recommendation['x_column']
+        
+        if recommendation['chart_type'] == 'dual_axis':
+            return 'dual_axis', {
+                'x_column': x_column,
+                'y1_column': recommendation['y1_column'],
+                'y2_column': recommendation['y2_column']
+            }
+        if recommendation['chart_type'] == 'bar':
+            return 'bar', {'x_column': x_column, 'y_column': recommendation['y1_column']}
+        
+        # line: every numeric column except the x-axis
+        y_columns = [col for col in numeric_columns if col != x_column]
+        return 'line', {'x_column': x_column, 'y_columns': y_columns}
+    
+    @staticmethod
+    def _plan_from_detection(
+        chart_type: str,
+        config: Dict[str, Any]
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Turn ChartBuilder's detected chart config into the same shape as
+        _plan_from_recommendation so the two can be compared
+        
+        Args:
+            chart_type: Chart type detected by ChartBuilder
+            config: Chart config detected by ChartBuilder
+            
+        Returns:
+            Tuple of (chart_type, column keyword arguments)
+        """
+        if chart_type == 'line':
+            # Same y columns as _plan_from_recommendation builds for a line chart
+            x_column = config['x_column']
+            y_columns = [col for col in config['y_columns'] if col != x_column]
+            return 'line', {'x_column': x_column, 'y_columns': y_columns}
+        
+        keys = {
+            'dual_axis': ('x_column', 'y1_column', 'y2_column'),
+            'bar': ('x_column', 'y_column')
+        }[chart_type]
+        return chart_type, {key: config[key] for key in keys}
+    
+    def _render(
+        self,
+        df: pd.DataFrame,
+        chart_type: str,
+        chart_args: Dict[str, Any],
+        title: str,
+        verbose: bool = True,
+        filename: Optional[str] = None
+    ) -> str:
+        """
+        Draw a chart of the given type
+        
+        Args:
+            df: Input DataFrame
+            chart_type: One of dual_axis, bar or line
+            chart_args: Column keyword arguments for the chart
+            title: Chart title
+            verbose: Print where the chart was saved
+            filename: Output filename (timestamped default if not provided)
+            
+        Returns:
+            Path to saved chart
+        """
+        options = dict(title=title, verbose=verbose, filename=filename, **chart_args)
+        if chart_type == 'dual_axis':
+            return self.charts.create_dual_axis_chart(df, **options)
+        if chart_type == 'bar':
+            return self.charts.create_bar_chart(df, **options)
+        return self.charts.create_line_chart(df, **options)
+    
+    def _keep_chart(self, temp_path: str, chart_type: str) -> str:
+        """
+        Move an accepted speculative chart to a normal, unused chart filename
+        
+        Args:
+            temp_path: Path of the speculative chart's temporary file
+            chart_type: Chart type, used as the filename prefix
+            
+        Returns:
+            Path to the kept chart
+        """
+        base = f"{chart_type}_chart_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        chart_path = os.path.join(self.charts.output_dir, f"{base}.png")
+        suffix = 1
+        while os.path.exists(chart_path):
+            chart_path = os.path.join(self.charts.output_dir, f"{base}_{suffix}.png")
+            suffix += 1
+        os.replace(temp_path, chart_path)
+        return chart_path
+    
+    @staticmethod
+    def _speculative_result(future: Optional[Future]) -> Optional[str]:
+        """Wait for the speculative render, returning its path or None if it failed"""
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception:
+            return None
+    
+    @staticmethod
+    def _discard_chart(temp_path: Optional[str]) -> None:
+        """Delete the speculative chart's temporary file"""
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+    
     def analyze_and_visualize(self, sheet_id: str = None, title: str = None):
         """
         Complete workflow: Fetch data → Ask AI → Create chart
@@ -38,49 +202,62 @@ class IntelligentAgent:
         print("\n📊 Step 1: Fetching data from Google Sheets...")
         df = self.sheets.fetch_data(sheet_id)
         print(f"   Retrieved {len(df)} rows")
-        # debugging 
-        # ADD THESE DEBUG LINES:
-        print(f"\n🔍 DEBUG - Actual columns in sheet: {df.columns.tolist()}")
-        print(f"🔍 DEBUG - Data preview:")
-        print(df.head())
+        if self.debug:
+            print(f"\n🔍 DEBUG - Actual columns in sheet: {df.columns.tolist()}")
+            print(f"🔍 DEBUG - Data preview:")
+            print(df.head())
         
         # Step 2: Prepare data summary for AI
         print("\n🧠 Step 2: Asking OpenAI for visualization recommendation...")
-        data_summary = df.describe().to_string()
+        data_summary = self._summarize(df)
         columns = df.columns.tolist()
+        numeric_columns = df.select_dtypes(include=['number']).columns.tolist()
+        title = title or "AI-Generated Visualization"
+        
+        # Guess the chart locally so it can render quietly while OpenAI is thinking
+        try:
+            guess = self._plan_from_detection(*self.charts.detect_chart_type(df, verbose=False))
+        except ValueError:
+            guess = None
         
-        # Get AI recommendation
-        recommendation = self.ai.analyze_data_for_visualization(
-            data_summary,
-            columns
-        )
+        # The speculative chart gets its own temporary file so discarding it
+        # can never touch a chart kept by an earlier run
+        temp_path = None
+        fut_speculative = None
+        
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            fut_reco = executor.submit(
+                self.ai.analyze_data_for_visualization,
+                data_summary,
+                columns
+            )
+            if guess:
+                fd, temp_path = tempfile.mkstemp(dir=self.charts.output_dir, suffix='.png')
+                os.close(fd)
+                fut_speculative = executor.submit(
+                    self._render, df, *guess, title, False, os.path.basename(temp_path)
+                )
+            
+            # Get AI recommendation
+            try:
+                recommendation = fut_reco.result()
+                plan = self._plan_from_recommendation(recommendation, numeric_columns)
+            except Exception:
+                self._speculative_result(fut_speculative)
+                self._discard_chart(temp_path)
+                raise
+            speculative_path = self._speculative_result(fut_speculative)
         
         # Step 3: Create chart based on AI recommendation
         print(f"\n📈 Step 3: Creating {recommendation['chart_type']} chart...")
         
-        if recommendation['chart_type'] == 'dual_axis':
-            chart_path = self.charts.create_dual_axis_chart(
-                df,
-                x_column=recommendation['x_column'],
-                y1_column=recommendation['y1_column'],
-                y2_column=recommendation['y2_column'],
-                title=title or "AI-Generated Visualization"
-            )
-        elif recommendation['chart_type'] == 'bar':
-            chart_path = self.charts.create_bar_chart(
-                df,
-                x_column=recommendation['x_column'],
-                y_column=recommendation['y1_column'],
-                title=title or "AI-Generated Visualization"
-            )
-        else:  # line
-            y_columns = [col for col in columns if col != recommendation['x_column']]
-            chart_path = self.charts.create_line_chart(
-                df,
-                x_column=recommendation['x_column'],
-                y_columns=y_columns,
-                title=title or "AI-Generated Visualization"
-            )
+        if plan == guess and speculative_path:
+            chart_path = self._keep_chart(temp_path, plan[0])
+            print(f"✓ Chart saved: {chart_path}")
+        else:
+            # The guess didn't match, discard it and draw what the AI asked for
+            self._discard_chart(temp_path)
+            chart_path = self._render(df, *plan, title)
         
         print("\n" + "=" * 60)
         print(f"✅ SUCCESS!")
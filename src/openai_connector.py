@@ -7,32 +7,144 @@ from openai import OpenAI
 import os
 from dotenv import load_dotenv
 from typing import Optional, Dict, Any
-import json
+import orjson
+import functools
+import hashlib
+import tempfile
 
 load_dotenv()
 
 
+@functools.lru_cache(maxsize=4)
+def _build_client(api_key: str) -> OpenAI:
+    """Build an OpenAI client, reusing its connection pool across connectors"""
+    return OpenAI(api_key=api_key)
+
+
+# Recommendation fields read by callers for each chart type
+_REQUIRED_KEYS = {
+    'dual_axis': {'chart_type', 'reasoning', 'x_column', 'y1_column', 'y2_column'},
+    'bar': {'chart_type', 'reasoning', 'x_column', 'y1_column'},
+    'line': {'chart_type', 'reasoning', 'x_column'},
+}
+
+
+def _read_json_stream(response) -> str:
+    """
+    Collect a streamed JSON object, stopping as soon as it closes
+    
+    Args:
+        response: Streaming chat completion
+        
+    Returns:
+        The complete JSON object text
+        
+    Raises:
+        ValueError: If the stream ends before the object closes
+    """
+    buf = []
+    finish_reason = None
+    depth = 0
+    in_string = False
+    escaped = False
+    
+    for chunk in response:
+        if not chunk.choices:
+            continue
+        choice = chunk.choices[0]
+        finish_reason = choice.finish_reason or finish_reason
+        text = choice.delta.content or ''
+        buf.append(text)
+        
+        # Track brace depth outside of string literals
+        for i, ch in enumerate(text):
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = in_string
+            elif ch == '"':
+                in_string = not in_string
+            elif not in_string and ch == '{':
+                depth += 1
+            elif not in_string and ch == '}':
+                depth -= 1
+                if depth == 0:
+                    buf[-1] = text[:i + 1]
+                    response.close()
+                    return ''.join(buf)
+    
+    if finish_reason == 'length':
+        raise ValueError("Response was cut off at the max_tokens limit before the JSON was complete")
+    raise ValueError(f"Response ended before the JSON was complete (finish_reason: {finish_reason})")
+
+
 class OpenAIConnector:
     """
     Production-ready OpenAI connector with error handling
     """
     
-    def __init__(self, model: str = "gpt-4o-mini"):
+    def __init__(
+        self,
+        model: str = "gpt-4o-mini",
+        cache_dir: Optional[str] = "~/.cache/agent"
+    ):
         """
         Initialize OpenAI connector
         
         Args:
             model: OpenAI model to use (gpt-4o-mini is cost-effective)
+            cache_dir: Directory for cached recommendations (None disables caching)
         """
         self.api_key = os.getenv('OPENAI_API_KEY')
         
         if not self.api_key:
             raise ValueError("OPENAI_API_KEY not found in .env file")
         
-        self.client = OpenAI(api_key=self.api_key)
+        self.client = _build_client(self.api_key)
         self.model = model
+        self.cache_dir = os.path.expanduser(cache_dir) if cache_dir else None
         print(f"✓ Connected to OpenAI ({self.model})")
     
+    def _cache_path(self, data_summary: str, columns: list) -> str:
+        """Return the cache file path for a data summary and column list"""
+        key = hashlib.blake2b(
+            self.model.encode() + data_summary.encode() + repr(columns).encode(),
+            digest_size=16
+        ).hexdigest()
+        return os.path.join(self.cache_dir, f"reco_{key}.json")
+    
+    @staticmethod
+    def _load_cached(cache_path: str) -> Optional[Dict[str, Any]]:
+        """Load a cached recommendation, treating unreadable or invalid files as a miss"""
+        try:
+            with open(cache_path, 'rb') as f:
+                recommendation = orjson.loads(f.read())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+        
+        # Make sure every field callers rely on for this chart type is present
+        if not isinstance(recommendation, dict):
+            return None
+        required = _REQUIRED_KEYS.get(recommendation.get('chart_type'), _REQUIRED_KEYS['line'])
+        if not required <= recommendation.keys():
+            return None
+        return recommendation
+    
+    def _store_cached(self, cache_path: str, recommendation: Dict[str, Any]) -> None:
+        """Write a recommendation to the cache atomically (failures are non-fatal)"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(orjson.dumps(recommendation))
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+        except Exception as e:
+            print(f"⚠ Could not cache recommendation: {str(e)}")
+    
     def analyze_data_for_visualization(
         self,
         data_summary: str,
@@ -49,6 +161,15 @@ class OpenAIConnector:
             Dictionary with chart recommendations
         """
         try:
+            # Reuse a previous recommendation for identical data
+            cache_path = self._cache_path(data_summary, columns) if self.cache_dir else None
+            recommendation = self._load_cached(cache_path) if cache_path else None
+            if recommendation is not None:
+                print("\n🤖 OpenAI Recommendation (cached):")
+                print(f"   Chart Type: {recommendation['chart_type']}")
+                print(f"   Reasoning: {recommendation['reasoning']}")
+                return recommendation
+            
             prompt = f"""You are a data visualization expert. Analyze this data and recommend the best chart type.
 
 Data Summary:
@@ -59,7 +180,7 @@ Columns: {columns}
 Based on this data, provide:
 1. The best chart type (bar, line, or dual_axis)
 2. Which columns should be on which axis
-3. Brief reasoning for your choice
+3. Brief reasoning for your choice (one short sentence)
 
 Respond in JSON format:
 {{
@@ -67,7 +188,7 @@ Respond in JSON format:
     "x_column": "column_name",
     "y1_column": "column_name",
     "y2_column": "column_name or null",
-    "reasoning": "brief explanation"
+    "reasoning": "one short sentence"
 }}"""
 
             response = self.client.chat.completions.create(
@@ -76,10 +197,17 @@ Respond in JSON format:
                     {"role": "system", "content": "You are a data visualization expert. Always respond with valid JSON."},
                     {"role": "user", "content": prompt}
                 ],
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                max_tokens=300,
+                temperature=0,
+                seed=0,
+                stream=True
             )
             
-            recommendation = json.loads(response.choices[0].message.content)
+            recommendation = orjson.loads(_read_json_stream(response))
+            
+            if cache_path:
+                self._store_cached(cache_path, recommendation)
             
             print("\n🤖 OpenAI Recommendation:")
             print(f"   Chart Type: {recommendation['chart_type']}")
@@ -3,9 +3,14 @@ Google Sheets Connector Tool
 Fetches data from Google Sheets with proper error handling
 """
 
+import functools
+import hashlib
+import json
+import re
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence, Tuple
+import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
 import os
@@ -13,41 +18,186 @@ import os
 load_dotenv()
 
 
+def _to_array(col: Sequence[str]) -> np.ndarray:
+    """
+    Convert a column of cell strings in one numpy call, trying int then float
+    and leaving it as text if any cell isn't numeric
+    
+    Args:
+        col: Cell values for one column
+        
+    Returns:
+        int64, float64 or object array
+    """
+    for dtype in (np.int64, np.float64):
+        try:
+            return np.asarray(col, dtype=dtype)
+        except (ValueError, OverflowError):
+            continue
+    return np.asarray(col, dtype=object)
+
+
+def _downcast(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shrink column dtypes without changing any values
+    
+    Integers go to the smallest int type that fits, floats to float32 when
+    that is lossless, and low-cardinality text columns become categories
+    (keeping first-appearance order so charts plot in sheet order).
+    
+    Args:
+        df: DataFrame to downcast
+        
+    Returns:
+        DataFrame with smaller dtypes
+    """
+    for col in df.select_dtypes(include='number').columns:
+        if pd.api.types.is_float_dtype(df[col]):
+            smaller = pd.to_numeric(df[col], downcast='float')
+            if smaller.astype(df[col].dtype).equals(df[col]):
+                df[col] = smaller
+        else:
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    
+    for col in df.select_dtypes(include=['object', 'string']).columns:
+        if len(df) and df[col].nunique() / len(df) < 0.5:
+            df[col] = pd.Categorical(df[col], categories=df[col].dropna().unique())
+    
+    return df
+
+
+@functools.lru_cache(maxsize=4)
+def _build_client(credentials_path: str) -> gspread.Client:
+    """
+    Build an authorized gspread client, shared by every connector
+    that uses the same credentials file
+    
+    Args:
+        credentials_path: Path to Google service account JSON
+        
+    Returns:
+        Authorized gspread client
+    """
+    scope = [
+        'https://spreadsheets.google.com/feeds',
+        'https://www.googleapis.com/auth/drive'
+    ]
+    creds = ServiceAccountCredentials.from_json_keyfile_name(
+        credentials_path, 
+        scope
+    )
+    client = gspread.authorize(creds)
+    print("✓ Successfully authenticated with Google Sheets")
+    return client
+
+
 class SheetsConnector:
     """
     A production-ready Google Sheets connector with error handling
     and type safety
     """
     
-    def __init__(self, credentials_path: str = "credentials.json"):
+    def __init__(
+        self,
+        credentials_path: str = "credentials.json",
+        cache_dir: Optional[str] = "~/.cache/sheets"
+    ):
         """
         Initialize the Google Sheets connector
         
         Args:
             credentials_path: Path to Google service account JSON
+            cache_dir: Directory for cached sheet data (None disables caching)
         """
         self.credentials_path = credentials_path
+        self.cache_dir = os.path.expanduser(cache_dir) if cache_dir else None
         self.client = None
+        self._sheet_cache: Dict[str, gspread.Spreadsheet] = {}
+        self._ws_cache: Dict[str, Dict[str, gspread.Worksheet]] = {}
         self._authenticate()
     
     def _authenticate(self) -> None:
         """Authenticate with Google Sheets API"""
         try:
-            scope = [
-                'https://spreadsheets.google.com/feeds',
-                'https://www.googleapis.com/auth/drive'
-            ]
-            creds = ServiceAccountCredentials.from_json_keyfile_name(
-                self.credentials_path, 
-                scope
-            )
-            self.client = gspread.authorize(creds)
-            print("✓ Successfully authenticated with Google Sheets")
+            self.client = _build_client(self.credentials_path)
         except FileNotFoundError:
             raise Exception(f"Credentials file not found: {self.credentials_path}")
         except Exception as e:
             raise Exception(f"Authentication failed: {str(e)}")
     
+    def _open_sheet(self, sheet_id: str) -> gspread.Spreadsheet:
+        """Open a spreadsheet, reusing the cached handle on repeat calls"""
+        if sheet_id not in self._sheet_cache:
+            self._sheet_cache[sheet_id] = self.client.open_by_key(sheet_id)
+        return self._sheet_cache[sheet_id]
+    
+    def _worksheets(self, sheet_id: str, refresh: bool = False) -> Dict[str, gspread.Worksheet]:
+        """Return the spreadsheet's worksheets by title, cached after the first lookup"""
+        if refresh or sheet_id not in self._ws_cache:
+            sheet = self._open_sheet(sheet_id)
+            self._ws_cache[sheet_id] = {ws.title: ws for ws in sheet.worksheets()}
+        return self._ws_cache[sheet_id]
+    
+    def _worksheet(self, sheet_id: str, worksheet_name: str) -> gspread.Worksheet:
+        """Look up a worksheet by title, refreshing the cache once on a miss"""
+        worksheets = self._worksheets(sheet_id)
+        if worksheet_name not in worksheets:
+            worksheets = self._worksheets(sheet_id, refresh=True)
+        if worksheet_name not in worksheets:
+            raise gspread.exceptions.WorksheetNotFound(worksheet_name)
+        return worksheets[worksheet_name]
+    
+    def _cache_paths(self, sheet_id: str, worksheet_name: str) -> Tuple[str, str]:
+        """Return the (parquet, meta) cache file paths for a worksheet"""
+        # The readable prefix can collide ("Sheet 1" vs "Sheet_1"), the title hash can't
+        safe_name = re.sub(r'[^\w.-]', '_', worksheet_name)
+        title_hash = hashlib.blake2b(worksheet_name.encode(), digest_size=8).hexdigest()
+        base = os.path.join(self.cache_dir, f"{sheet_id}_{safe_name}_{title_hash}")
+        return f"{base}.parquet", f"{base}.meta.json"
+    
+    @staticmethod
+    def _modified_time(sheet: gspread.Spreadsheet) -> Optional[str]:
+        """Return the sheet's Drive modifiedTime, or None if it can't be looked up"""
+        try:
+            return sheet.get_lastUpdateTime()
+        except Exception as e:
+            print(f"⚠ Could not check sheet modifiedTime, skipping cache: {str(e)}")
+            return None
+    
+    def _load_cached(
+        self,
+        sheet_id: str,
+        worksheet_name: str,
+        modified_time: str
+    ) -> Optional[pd.DataFrame]:
+        """Load cached worksheet data if it matches the sheet's modifiedTime"""
+        data_path, meta_path = self._cache_paths(sheet_id, worksheet_name)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta.get('modifiedTime') != modified_time or meta.get('worksheet') != worksheet_name:
+                return None
+            return pd.read_parquet(data_path)
+        except Exception:
+            return None
+    
+    def _store_cached(
+        self,
+        sheet_id: str,
+        worksheet_name: str,
+        modified_time: str,
+        df: pd.DataFrame
+    ) -> None:
+        """Write worksheet data to the cache (failures are non-fatal)"""
+        data_path, meta_path = self._cache_paths(sheet_id, worksheet_name)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            df.to_parquet(data_path, compression='zstd')
+            with open(meta_path, 'w') as f:
+                json.dump({'modifiedTime': modified_time, 'worksheet': worksheet_name}, f)
+        except Exception as e:
+            print(f"⚠ Could not cache {worksheet_name}: {str(e)}")
+    
     def fetch_data(
         self, 
         sheet_id: Optional[str] = None,
@@ -71,17 +221,29 @@ class SheetsConnector:
                 raise ValueError("No sheet ID provided and GOOGLE_SHEET_ID not in .env")
             
             # Open the sheet
-            sheet = self.client.open_by_key(sheet_id)
-            worksheet = sheet.worksheet(worksheet_name)
+            sheet = self._open_sheet(sheet_id)
             
-            # Get all values
-            data = worksheet.get_all_records()
+            # Skip the download if the sheet hasn't changed since it was cached
+            modified_time = self._modified_time(sheet) if self.cache_dir else None
+            if modified_time:
+                df = self._load_cached(sheet_id, worksheet_name, modified_time)
+                if df is not None:
+                    print(f"✓ Loaded {len(df)} rows from cache for {worksheet_name}")
+                    return df
             
-            if not data:
+            worksheet = self._worksheet(sheet_id, worksheet_name)
+            
+            # Get all values as a 2D list (header row first)
+            raw = worksheet.get_all_values()
+            
+            if len(raw) < 2:
                 raise ValueError(f"No data found in worksheet: {worksheet_name}")
             
             # Convert to DataFrame
-            df = pd.DataFrame(data)
+            df = self._to_dataframe(raw)
+            
+            if modified_time:
+                self._store_cached(sheet_id, worksheet_name, modified_time, df)
             
             print(f"✓ Successfully fetched {len(df)} rows from {worksheet_name}")
             return df
@@ -93,6 +255,75 @@ class SheetsConnector:
         except Exception as e:
             raise Exception(f"Error fetching data: {str(e)}")
     
+    def fetch_many(
+        self,
+        sheet_id: Optional[str] = None,
+        worksheet_names: Optional[List[str]] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch several worksheets in a single values.batchGet request
+        
+        Args:
+            sheet_id: Google Sheet ID (uses env variable if not provided)
+            worksheet_names: Worksheets to fetch (all worksheets if not provided)
+            
+        Returns:
+            Dictionary mapping worksheet name to its DataFrame
+        """
+        try:
+            sheet_id = sheet_id or os.getenv('GOOGLE_SHEET_ID')
+            
+            if not sheet_id:
+                raise ValueError("No sheet ID provided and GOOGLE_SHEET_ID not in .env")
+            
+            sheet = self._open_sheet(sheet_id)
+            # Listing every worksheet always re-reads the tabs so new ones aren't missed
+            worksheet_names = worksheet_names or list(self._worksheets(sheet_id, refresh=True))
+            
+            # Check every title up front so an unknown one fails like fetch_data
+            for name in worksheet_names:
+                self._worksheet(sheet_id, name)
+            
+            # One request covering every worksheet range
+            ranges = [gspread.utils.absolute_range_name(name) for name in worksheet_names]
+            response = sheet.values_batch_get(ranges)
+            
+            frames = {}
+            for name, value_range in zip(worksheet_names, response.get('valueRanges', [])):
+                # The API trims trailing empty cells, so pad rows back to a rectangle
+                raw = gspread.utils.fill_gaps(value_range.get('values', []))
+                
+                if len(raw) < 2:
+                    raise ValueError(f"No data found in worksheet: {name}")
+                
+                frames[name] = self._to_dataframe(raw)
+            
+            print(f"✓ Successfully fetched {len(frames)} worksheets in one request")
+            return frames
+            
+        except gspread.exceptions.WorksheetNotFound as e:
+            raise Exception(f"Worksheet '{e}' not found")
+        except gspread.exceptions.SpreadsheetNotFound:
+            raise Exception(f"Spreadsheet with ID '{sheet_id}' not found")
+        except Exception as e:
+            raise Exception(f"Error fetching data: {str(e)}")
+    
+    @staticmethod
+    def _to_dataframe(raw: List[List[str]]) -> pd.DataFrame:
+        """
+        Build a DataFrame from raw sheet values
+        
+        Args:
+            raw: 2D list of cell values, header row first
+            
+        Returns:
+            pandas DataFrame with numeric columns converted and downcast
+        """
+        columns = list(zip(*raw[1:]))
+        df = pd.DataFrame({i: _to_array(col) for i, col in enumerate(columns)})
+        df.columns = raw[0][:len(columns)]
+        return _downcast(df)
+    
     def get_worksheet_names(self, sheet_id: Optional[str] = None) -> List[str]:
         """
         Get all worksheet names in a spreadsheet
@@ -105,8 +336,8 @@ class SheetsConnector:
         """
         try:
             sheet_id = sheet_id or os.getenv('GOOGLE_SHEET_ID')
-            sheet = self.client.open_by_key(sheet_id)
-            return [ws.title for ws in sheet.worksheets()]
+            # Always re-read the tabs; this also refreshes the worksheet cache
+            return list(self._worksheets(sheet_id, refresh=True))
         except Exception as e:
             raise Exception(f"Error getting worksheet names: {str(e)}")
 